@@ -23,12 +23,20 @@ CONFIG = {
     # Data extraction configuration
     'NUM_CHUNKS': 20,                    # Number of MPI chunks
     'DAT_PATTERN': 'PELOOP.%08d.dat',    # Data file pattern
+    'BINARY_OUTPUT': False,              # Write intermediate states as pxyz.npy
     
     # Job monitoring configuration
-    'CHECK_INTERVAL': 60,                 # Status check interval (seconds)
+    'CHECK_INTERVAL': 60,                 # Initial status check interval (seconds)
+    'MAX_CHECK_INTERVAL': 600,            # Upper bound for check interval (seconds)
+    'BACKOFF_AFTER': 10,                  # Double interval after this many checks
     
     # Log file name
     'LOG_FILE': 'sequential_run.log',
+    
+    # Hard-link template files into work directories and backups instead of
+    # copying them (falls back to copying, e.g. across filesystems). Only
+    # enable if the simulation never rewrites template files in place.
+    'LINK_FILES': False,
 }
 
 # ==================== Simulation Steps Configuration ====================
@@ -19,13 +19,29 @@ Usage:
 """
 
 import os
+import atexit
 import sys
+import math
 import time
 import subprocess
 import argparse
 import numpy as np
 from datetime import datetime
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+from functools import lru_cache
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
 
 # Import configuration
 try:
@@ -42,24 +58,53 @@ INPUT_FILE = CONFIG.get('INPUT_FILE', 'inputN.in')
 NUM_CHUNKS = CONFIG.get('NUM_CHUNKS', 20)
 DAT_PATTERN = CONFIG.get('DAT_PATTERN', 'PELOOP.%08d.dat')
 CHECK_INTERVAL = CONFIG.get('CHECK_INTERVAL', 60)
+MAX_CHECK_INTERVAL = CONFIG.get('MAX_CHECK_INTERVAL', 600)
+BACKOFF_AFTER = CONFIG.get('BACKOFF_AFTER', 10)
 LOG_FILE = CONFIG.get('LOG_FILE', 'sequential_run.log')
+LINK_FILES = CONFIG.get('LINK_FILES', False)
+BINARY_OUTPUT = CONFIG.get('BINARY_OUTPUT', False)
 
 WORK_DIR = None
 
+PXYZ_BLOCK_ROWS = 1 << 18
+
+_LOG_FH = None
+
 
 def log_message(message, print_to_screen=True):
     """Write message to log file and optionally print to screen."""
+    global _LOG_FH
+    
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     log_msg = f"[{timestamp}] {message}"
     
-    log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), LOG_FILE)
-    with open(log_path, 'a') as f:
-        f.write(log_msg + '\n')
+    if _LOG_FH is None:
+        log_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), LOG_FILE)
+        _LOG_FH = open(log_path, 'a', buffering=65536)
+        atexit.register(_LOG_FH.close)
+    _LOG_FH.write(log_msg + '\n')
     
     if print_to_screen:
         print(log_msg)
 
 
+def flush_log():
+    """Flush buffered log messages to disk."""
+    if _LOG_FH is not None:
+        _LOG_FH.flush()
+
+
+def _link_or_copy(src, dst):
+    """Hard-link src to dst, falling back to a full copy if linking fails."""
+    if LINK_FILES:
+        try:
+            os.link(src, dst)
+            return dst
+        except OSError:
+            pass
+    return shutil.copy2(src, dst)
+
+
 def read_input_file(filepath):
     """Read input file and return lines as a list."""
     with open(filepath, 'r') as f:
@@ -67,9 +112,17 @@ def read_input_file(filepath):
 
 
 def write_input_file(filepath, lines):
-    """Write modified lines back to input file."""
-    with open(filepath, 'w') as f:
+    """Write modified lines back to input file, replacing it atomically."""
+    dirname = os.path.dirname(os.path.abspath(filepath))
+    with tempfile.NamedTemporaryFile('w', dir=dirname, delete=False) as f:
         f.writelines(lines)
+    try:
+        if os.path.exists(filepath):
+            shutil.copymode(filepath, f.name)
+        os.replace(f.name, filepath)
+    except OSError:
+        os.unlink(f.name)
+        raise
 
 
 def modify_input_params(params):
@@ -80,8 +133,10 @@ def modify_input_params(params):
     
     lines = read_input_file(input_path)
     
-    for line_key, new_content in params.items():
-        line_num = int(line_key.replace('line', ''))
+    updates = sorted((int(line_key.replace('line', '')), new_content)
+                     for line_key, new_content in params.items())
+    
+    for line_num, new_content in updates:
         old_line = lines[line_num - 1]
         if '!' in old_line:
             comment = '!' + old_line.split('!', 1)[1]
@@ -96,10 +151,8 @@ def modify_input_params(params):
 
 def submit_job():
     """Submit job to SLURM scheduler."""
-    os.chdir(WORK_DIR)
-    
     try:
-        result = subprocess.run(['sbatch', JOB_SCRIPT], 
+        result = subprocess.run(['sbatch', JOB_SCRIPT], cwd=WORK_DIR,
                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                               universal_newlines=True, check=True)
         output = result.stdout.strip()
@@ -113,89 +166,418 @@ def submit_job():
     except subprocess.CalledProcessError as e:
         log_message(f"ERROR: Job submission failed: {e}")
         return None
-    finally:
-        os.chdir('..')
 
 
-def check_job_status(job_id):
+def check_job_status(job_id, argv=None):
     """Check if job is still running."""
+    if argv is None:
+        argv = ['squeue', '-h', '-o', '%T', '-j', job_id]
     try:
-        result = subprocess.run(['squeue', '-j', job_id], 
+        result = subprocess.run(argv, 
                               stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                               universal_newlines=True)
-        return job_id in result.stdout
+        return bool(result.stdout.strip())
     except Exception as e:
         log_message(f"WARNING: Error checking job status: {e}")
         return False
 
 
 def wait_for_job_completion(job_id):
-    """Wait for job to complete with periodic status checks. No timeout limit."""
+    """Wait for job to complete with periodic status checks. No timeout limit.
+    
+    The check interval starts at CHECK_INTERVAL and doubles after every
+    BACKOFF_AFTER polls, up to MAX_CHECK_INTERVAL.
+    """
     log_message(f"Waiting for job {job_id} to complete...")
+    flush_log()
     start_time = time.time()
     
+    argv = ['squeue', '-h', '-o', '%T', '-j', job_id]
+    interval = CHECK_INTERVAL
+    polls = 0
+    next_report = 600
+    
     while True:
         elapsed = time.time() - start_time
         
-        if not check_job_status(job_id):
+        if not check_job_status(job_id, argv):
             log_message(f"Job {job_id} completed after {elapsed/60:.1f} minutes")
             return True
         
-        time.sleep(CHECK_INTERVAL)
-        
-        if int(elapsed) % 600 == 0:
+        if elapsed >= next_report:
             log_message(f"Job {job_id} still running... ({elapsed/60:.0f} min elapsed)", 
                        print_to_screen=False)
+            flush_log()
+            while next_report <= elapsed:
+                next_report += 600
+        
+        time.sleep(interval)
+        
+        polls += 1
+        if polls % BACKOFF_AFTER == 0:
+            interval = min(interval * 2, MAX_CHECK_INTERVAL)
+
+
+@lru_cache(maxsize=4)
+def _ijk_columns(nx, ny, nz):
+    """Return the read-only 1-based (i, j, k) index columns of an nx*ny*nz grid."""
+    I, J, K = np.mgrid[1:nx+1, 1:ny+1, 1:nz+1]
+    ijk = np.column_stack([I.ravel(), J.ravel(), K.ravel()]).astype(np.int32)
+    ijk.setflags(write=False)
+    return ijk
+
+
+def _open_sequential(fname):
+    """Open fname for buffered reading, hinting the kernel to read ahead."""
+    fd = os.open(fname, os.O_RDONLY)
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return os.fdopen(fd, 'r', buffering=1 << 20)
+
+
+def _parse_rows(f):
+    """Parse chunk data rows line by line, skipping rows with fewer than six fields."""
+    rows = []
+    for line in f:
+        pts = line.split()
+        if len(pts) < 6:
+            continue
+        rows.append((*map(int, pts[:3]), *map(float, pts[3:6])))
+    return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+
+def parse_chunk(fname, read_header=True):
+    """Read one PELOOP chunk file and return its header and data rows.
+    
+    With read_header=False the header line is only checked for three fields
+    and None is returned in its place; all chunks of a run share the same
+    grid header. Rows are None if the header line is missing or short.
+    """
+    with _open_sequential(fname) as f:
+        header = f.readline().split()
+        if len(header) < 3:
+            return header, None
+        if not read_header:
+            header = None
+        
+        start = f.tell()
+        try:
+            if pd is not None:
+                try:
+                    data = pd.read_csv(f, sep=r'\s+', header=None, names=range(6),
+                                       usecols=range(6), index_col=False,
+                                       dtype=np.float32, engine='c').to_numpy()
+                except pd.errors.EmptyDataError:
+                    data = np.empty((0, 6), dtype=np.float32)
+                # pandas pads short rows with NaN, which cannot be told apart
+                # from genuine nan values here; let the line parser decide
+                if np.isnan(data).any():
+                    raise ValueError("NaN in chunk data")
+            else:
+                data = np.loadtxt(f, dtype=np.float32, usecols=(0, 1, 2, 3, 4, 5), ndmin=2)
+        except ValueError:
+            # Short or cut-off rows (e.g. the last line of a killed job):
+            # reparse line by line, skipping rows with fewer than six fields
+            # and keeping genuine nan values, as the original parser did
+            f.seek(start)
+            data = _parse_rows(f)
+    return header, data
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _float_parts(v):
+        """Split v into (negative, 6-digit mantissa, exponent) as '%.5e' rounds it.
+        
+        Only exact for values representable in float32: the decimal scaling
+        is done in float64 and rounds before the tie test, which float64
+        inputs closer than that to a rounding boundary get wrong.
+        """
+        neg = math.copysign(1.0, v) < 0.0
+        a = abs(v)
+        if a == 0.0:
+            return neg, 0, 0
+        e = int(math.floor(math.log10(a)))
+        for _ in range(2):
+            k = 5 - e
+            if k <= 0:
+                m = a / 10.0 ** -k
+            elif k <= 300:
+                m = a * 10.0 ** k
+            else:
+                m = a * 1e300 * 10.0 ** (k - 300)
+            if m < 100000.0:
+                e -= 1
+            elif m >= 1000000.0:
+                e += 1
+            else:
+                break
+        mant = int(math.floor(m))
+        frac = m - mant
+        if frac > 0.5 or (frac == 0.5 and mant % 2 == 1):
+            mant += 1
+        if mant == 1000000:
+            mant = 100000
+            e += 1
+        return neg, mant, e
+    
+    @njit(cache=True)
+    def _int_len(n):
+        length = 1 if n >= 0 else 2
+        n = abs(n)
+        while n >= 10:
+            n //= 10
+            length += 1
+        return length
+    
+    @njit(cache=True)
+    def _put_int(buf, pos, n):
+        if n < 0:
+            buf[pos] = 45  # '-'
+            pos += 1
+            n = -n
+        end = pos + _int_len(n)
+        for q in range(end - 1, pos - 1, -1):
+            buf[q] = 48 + n % 10
+            n //= 10
+        return end
+    
+    @njit(cache=True)
+    def _float_len(v):
+        if math.isnan(v):
+            return 3
+        if math.isinf(v):
+            return 4 if v < 0 else 3
+        neg, mant, e = _float_parts(v)
+        return (1 if neg else 0) + 9 + max(_int_len(abs(e)), 2)
+    
+    @njit(cache=True)
+    def _put_float(buf, pos, v):
+        if math.isnan(v) or math.isinf(v):
+            if v < 0:
+                buf[pos] = 45  # '-'
+                pos += 1
+            word = 'nan' if math.isnan(v) else 'inf'
+            for ch in word:
+                buf[pos] = ord(ch)
+                pos += 1
+            return pos
+        neg, mant, e = _float_parts(v)
+        if neg:
+            buf[pos] = 45  # '-'
+            pos += 1
+        buf[pos] = 48 + mant // 100000
+        buf[pos + 1] = 46  # '.'
+        for q in range(6, 1, -1):
+            buf[pos + q] = 48 + mant % 10
+            mant //= 10
+        buf[pos + 7] = 101  # 'e'
+        buf[pos + 8] = 45 if e < 0 else 43  # '-' / '+'
+        pos += 9
+        e = abs(e)
+        if e < 10:
+            buf[pos] = 48
+            pos += 1
+        return _put_int(buf, pos, e)
+    
+    @njit(parallel=True, cache=True)
+    def _format_pxyz_rows(out):
+        """Format float32 (N, 6) rows as 'i j k px py pz' lines into a byte buffer."""
+        n = out.shape[0]
+        lens = np.empty(n, dtype=np.int64)
+        for r in prange(n):
+            length = 6  # five separators and the newline
+            for c in range(3):
+                length += _int_len(int(out[r, c]))
+            for c in range(3, 6):
+                length += _float_len(float(out[r, c]))
+            lens[r] = length
+        
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(lens)
+        buf = np.empty(offsets[n], dtype=np.uint8)
+        
+        for r in prange(n):
+            pos = offsets[r]
+            for c in range(6):
+                if c < 3:
+                    pos = _put_int(buf, pos, int(out[r, c]))
+                else:
+                    pos = _put_float(buf, pos, float(out[r, c]))
+                buf[pos] = 10 if c == 5 else 32  # newline / space
+                pos += 1
+        return buf
+
+
+def write_pxyz(path, nx, ny, nz, out):
+    """Write (N, 6) i/j/k + polarization rows to path in pxyz.in format.
+    
+    float32 tables go through the Numba formatter when it is available;
+    anything else is written with np.savetxt.
+    """
+    # Replace rather than truncate: pxyz.in may be hard-linked into backups
+    tmp_path = path + '.tmp'
+    if njit is not None and out.dtype == np.float32:
+        with open(tmp_path, 'wb') as f:
+            f.write(f"{nx} {ny} {nz}\n".encode())
+            # Format in blocks to bound the size of the text buffer
+            for start in range(0, len(out), PXYZ_BLOCK_ROWS):
+                f.write(_format_pxyz_rows(out[start:start + PXYZ_BLOCK_ROWS]))
+    else:
+        with open(tmp_path, 'w', buffering=1 << 20) as f:
+            f.write(f"{nx} {ny} {nz}\n")
+            np.savetxt(f, out, fmt='%d %d %d %.5e %.5e %.5e')
+    os.replace(tmp_path, path)
+
+
+def convert_pxyz_npy():
+    """Convert pxyz.npy in the work directory to an ASCII pxyz.in."""
+    npy_path = os.path.join(WORK_DIR, 'pxyz.npy')
+    log_message(f"Converting {npy_path} to pxyz.in...")
+    
+    try:
+        P = np.load(npy_path)
+        nx, ny, nz = P.shape[:3]
+        out = np.empty((nx * ny * nz, 6), dtype=np.float32)
+        out[:, :3] = _ijk_columns(nx, ny, nz)
+        out[:, 3:] = P.reshape(-1, 3)
+        write_pxyz(os.path.join(WORK_DIR, 'pxyz.in'), nx, ny, nz, out)
+    except Exception as e:
+        log_message(f"ERROR during pxyz.npy conversion: {e}")
+        return False
+    
+    log_message(f"Successfully generated pxyz.in with {nx*ny*nz} grid points")
+    return True
 
 
 def extract_final_state(final_step):
     """Extract final polarization state from PELOOP files and generate pxyz.in."""
     log_message(f"Extracting final state at step {final_step}...")
     
-    pxx = pyy = pzz = None
     nx = ny = nz = None
     
-    os.chdir(WORK_DIR)
-    
     try:
-        for chunk in range(NUM_CHUNKS):
-            idx = final_step + chunk
-            fname = DAT_PATTERN % idx
-            
-            if not os.path.isfile(fname):
+        fnames = [DAT_PATTERN % (final_step + chunk) for chunk in range(NUM_CHUNKS)]
+        
+        dat_dir, dat_name = os.path.split(os.path.join(WORK_DIR, DAT_PATTERN))
+        dat_prefix = dat_name.split('%', 1)[0]
+        try:
+            with os.scandir(dat_dir) as entries:
+                present = {e.name for e in entries
+                           if e.name.startswith(dat_prefix) and e.is_file()}
+        except FileNotFoundError:
+            present = set()
+        
+        for fname in fnames:
+            if os.path.basename(fname) not in present:
                 log_message(f"ERROR: Missing data file: {fname}")
                 return False
+        
+        data = None
+        n_rows = 0
+        max_workers = min(NUM_CHUNKS, os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(parse_chunk, os.path.join(WORK_DIR, fname), chunk == 0)
+                       for chunk, fname in enumerate(fnames)]
             
-            with open(fname) as f:
-                header = f.readline().split()
-                if len(header) < 3:
+            for chunk, fname in enumerate(fnames):
+                header, rows = futures[chunk].result()
+                # Drop the reference so each parsed chunk is freed once copied
+                futures[chunk] = None
+                if rows is None:
                     log_message(f"ERROR: Bad header in {fname}")
                     return False
                 
-                if pxx is None:
+                if nx is None:
                     nx, ny, nz = map(int, header[:3])
                     log_message(f"Grid dimensions: nx={nx}, ny={ny}, nz={nz}")
-                    pxx = np.zeros((nx, ny, nz))
-                    pyy = np.zeros((nx, ny, nz))
-                    pzz = np.zeros((nx, ny, nz))
+                    data = np.empty((nx * ny * nz, 6), dtype=np.float32)
                 
-                for line in f:
-                    pts = line.split()
-                    if len(pts) < 6:
-                        continue
-                    i1, j1, k1 = map(int, pts[:3])
-                    px, py, pz = map(float, pts[3:6])
-                    pxx[i1-1, j1-1, k1-1] = px
-                    pyy[i1-1, j1-1, k1-1] = py
-                    pzz[i1-1, j1-1, k1-1] = pz
+                if n_rows + len(rows) > len(data):
+                    # Overlapping chunks: more rows than grid points
+                    grown = np.empty((max(2 * len(data), n_rows + len(rows)), 6),
+                                     dtype=np.float32)
+                    grown[:n_rows] = data[:n_rows]
+                    data = grown
+                data[n_rows:n_rows + len(rows)] = rows
+                n_rows += len(rows)
+                del rows
+        
+        data = data[:n_rows]
+        n_points = nx * ny * nz
+        
+        for c, n in enumerate((nx, ny, nz)):
+            # Written so that nan indices fail the check as well
+            if n_rows and not (data[:, c].min() >= 1 and data[:, c].max() <= n):
+                raise ValueError("grid index out of range in PELOOP data")
+        
+        # Linear i-j-k index, accumulated in place from the float32 columns
+        lin = data[:, 0].astype(np.intp)
+        lin -= 1
+        for c, n in ((1, ny), (2, nz)):
+            lin *= n
+            np.add(lin, data[:, c], out=lin, casting='unsafe')
+            lin -= 1
+        
+        # lin is within [0, n_points), so n_points distinct values cover the grid
+        in_order = dense = lin.size == n_points
+        if dense:
+            in_order = bool((lin[1:] > lin[:-1]).all())
+        if dense and not in_order:
+            seen = np.zeros(n_points, dtype=bool)
+            seen[lin] = True
+            dense = seen.all()
+            del seen
+        
+        if in_order:
+            # Chunks already list every grid point once in i-j-k order
+            out = data
+        elif dense:
+            # Every grid point appears exactly once: permute the rows into
+            # i-j-k order one column at a time to avoid a second full copy
+            for c in range(6):
+                col = data[:, c].copy()
+                data[lin, c] = col
+            del col
+            out = data
+        else:
+            # Sparse or overlapping chunks: keep the last row per grid point (the
+            # stable sort preserves chunk order) so the scatter indices are unique
+            # and the bulk assignment is well defined; missing points stay zero
+            order = np.argsort(lin, kind='stable')
+            sorted_lin = lin[order]
+            last = np.ones(sorted_lin.size, dtype=bool)
+            last[:-1] = sorted_lin[1:] != sorted_lin[:-1]
+            keep = order[last]
+            out = np.zeros((n_points, 6), dtype=np.float32)
+            out[:, :3] = _ijk_columns(nx, ny, nz)
+            out[sorted_lin[last], 3:] = data[keep, 3:]
+            del order, sorted_lin, last, keep
+        del data, lin
+        
+        if BINARY_OUTPUT:
+            log_message("Writing pxyz.npy...")
+            P = out[:, 3:].astype(np.float32, copy=False).reshape(nx, ny, nz, 3)
+            npy_path = os.path.join(WORK_DIR, 'pxyz.npy')
+            with open(npy_path + '.tmp', 'wb') as f:
+                np.save(f, P)
+            os.replace(npy_path + '.tmp', npy_path)
+            
+            # Move the initial pxyz.in aside so it cannot be mistaken for
+            # the current state by the next step or by backups
+            pxyz_path = os.path.join(WORK_DIR, 'pxyz.in')
+            if os.path.isfile(pxyz_path):
+                os.replace(pxyz_path, pxyz_path + '.initial')
+                log_message(f"Moved stale pxyz.in to {pxyz_path}.initial")
+            
+            log_message(f"Successfully generated pxyz.npy with {n_points} grid points")
+            return True
         
         log_message("Writing pxyz.in...")
-        with open('pxyz.in', 'w') as f:
-            f.write(f"{nx} {ny} {nz}\n")
-            for i in range(nx):
-                for j in range(ny):
-                    for k in range(nz):
-                        f.write(f"{i+1} {j+1} {k+1} {pxx[i,j,k]:.5e} {pyy[i,j,k]:.5e} {pzz[i,j,k]:.5e}\n")
+        write_pxyz(os.path.join(WORK_DIR, 'pxyz.in'), nx, ny, nz, out)
         
         log_message(f"Successfully generated pxyz.in with {nx*ny*nz} grid points")
         return True
@@ -203,8 +585,6 @@ def extract_final_state(final_step):
     except Exception as e:
         log_message(f"ERROR during data extraction: {e}")
         return False
-    finally:
-        os.chdir('..')
 
 
 def backup_files(step_num, step_name):
@@ -214,24 +594,35 @@ def backup_files(step_num, step_name):
     
     files_to_backup = [
         os.path.join(WORK_DIR, INPUT_FILE),
-        os.path.join(WORK_DIR, 'pxyz.in'),
+        os.path.join(WORK_DIR, 'pxyz.npy' if BINARY_OUTPUT else 'pxyz.in'),
     ]
     
     for src in files_to_backup:
         if os.path.isfile(src):
             dst = os.path.join(backup_dir, os.path.basename(src))
-            shutil.copy2(src, dst)
+            _link_or_copy(src, dst)
     
     log_message(f"Backed up files to {backup_dir}/")
 
 
+Line8 = namedtuple('Line8', ['kstep', 'kprint', 'kbackup', 'kstart'])
+
+
+def parse_line8(value):
+    """Parse a 'kstep kprint kbackup kstart' line8 value."""
+    return Line8(*map(int, value.split()[:4]))
+
+
 def preview_steps():
-    """Preview and validate configuration."""
+    """Preview and validate configuration in a single pass over STEPS."""
     print("="*80)
     print("SEQUENTIAL STEPS PREVIEW")
     print("="*80)
     print(f"\nTotal steps configured: {len(STEPS)}\n")
     
+    errors = []
+    prev_final = None
+    
     for i, step in enumerate(STEPS, 1):
         print(f"\n{'='*80}")
         print(f"STEP {i}: {step['name']}")
@@ -244,37 +635,31 @@ def preview_steps():
             line_num = line.replace('line', '')
             print(f"  Line {line_num:>2}: {value}")
         
-        if i == 1:
+        if prev_final is None:
             duration = step['final_step']
         else:
-            duration = step['final_step'] - STEPS[i-2]['final_step']
+            duration = step['final_step'] - prev_final
         print(f"\nDuration: {duration} steps")
+        
+        if 'line8' in step['params']:
+            line8 = parse_line8(step['params']['line8'])
+            
+            # Check step continuity
+            if prev_final is not None and line8.kstart != prev_final:
+                errors.append(f"Step {i}: kstart={line8.kstart} doesn't match previous final_step={prev_final}")
+            
+            # Check final_step consistency
+            expected_final = line8.kstep + line8.kstart
+            if expected_final != step['final_step']:
+                errors.append(f"Step {i}: kstep({line8.kstep})+kstart({line8.kstart})={expected_final} doesn't match final_step={step['final_step']}")
+        
+        prev_final = step['final_step']
     
     # Validation
     print("\n" + "="*80)
     print("VALIDATION CHECKS")
     print("="*80)
     
-    errors = []
-    
-    # Check step continuity
-    for i in range(1, len(STEPS)):
-        if 'line8' in STEPS[i]['params']:
-            current_kstart = int(STEPS[i]['params']['line8'].split()[3])
-            prev_final = STEPS[i-1]['final_step']
-            if current_kstart != prev_final:
-                errors.append(f"Step {i+1}: kstart={current_kstart} doesn't match previous final_step={prev_final}")
-    
-    # Check final_step consistency
-    for i, step in enumerate(STEPS, 1):
-        if 'line8' in step['params']:
-            line8_parts = step['params']['line8'].split()
-            kstep = int(line8_parts[0])
-            kstart = int(line8_parts[3])
-            expected_final = kstep + kstart
-            if expected_final != step['final_step']:
-                errors.append(f"Step {i}: kstep({kstep})+kstart({kstart})={expected_final} doesn't match final_step={step['final_step']}")
-    
     if errors:
         print("\n❌ ERRORS FOUND:")
         for err in errors:
@@ -322,6 +707,7 @@ def run_sequential_steps():
         backup_files(step_idx, step_config['name'])
         
         log_message(f"\n✓ Step {step_idx} completed successfully!")
+        flush_log()
     
     return True
 
@@ -339,14 +725,15 @@ def create_work_directory():
         return None
     
     try:
-        shutil.copytree(SOURCE_DIR, work_dir, 
+        shutil.copytree(SOURCE_DIR, work_dir, copy_function=_link_or_copy,
                        ignore=shutil.ignore_patterns('*.dat', 'PELOOP.*', 'slurm-*', 'fort.*', 'energy_out.dat'))
         print(f"✓ Work directory created successfully")
         
         pxyz_src = os.path.join(SOURCE_DIR, 'pxyz.in')
         if os.path.isfile(pxyz_src):
             pxyz_dst = os.path.join(work_dir, 'pxyz.in')
-            shutil.copy2(pxyz_src, pxyz_dst)
+            if not os.path.isfile(pxyz_dst):
+                _link_or_copy(pxyz_src, pxyz_dst)
             print(f"✓ Copied initial pxyz.in")
         
         return work_dir
@@ -425,6 +812,12 @@ Examples:
     log_message("\nStarting sequential execution...\n")
     success = run_sequential_steps()
     
+    # Leave an ASCII pxyz.in for the last extracted state, also after a failure
+    if BINARY_OUTPUT and os.path.isfile(os.path.join(WORK_DIR, 'pxyz.npy')):
+        if not convert_pxyz_npy():
+            log_message("ERROR: Failed to convert final state to pxyz.in.")
+            success = False
+    
     if success:
         log_message("\n" + "="*70)
         log_message("ALL STEPS COMPLETED SUCCESSFULLY!")
@@ -437,6 +830,8 @@ Examples:
         log_message("EXECUTION STOPPED DUE TO ERROR")
         log_message("="*70)
         log_message(f"Check log file for details: {LOG_FILE}")
+    
+    flush_log()
 
 
 if __name__ == '__main__':
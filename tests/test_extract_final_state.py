@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checks extract_final_state against a per-line reference parser for the
+chunk layouts it special-cases: in-order, shuffled, sparse, overlapping,
+out-of-range and empty chunk sets.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sequential_run
+
+NX, NY, NZ = 4, 3, 5
+NUM_CHUNKS = 4
+FINAL_STEP = 7000
+
+
+@pytest.fixture(params=['pandas', 'numpy'])
+def work_dir(request, tmp_path, monkeypatch):
+    if request.param == 'pandas':
+        pytest.importorskip('pandas')
+    else:
+        monkeypatch.setattr(sequential_run, 'pd', None)
+    monkeypatch.setattr(sequential_run, 'WORK_DIR', str(tmp_path))
+    monkeypatch.setattr(sequential_run, 'NUM_CHUNKS', NUM_CHUNKS)
+    monkeypatch.setattr(sequential_run, 'DAT_PATTERN', 'PELOOP.%08d.dat')
+    monkeypatch.setattr(sequential_run, 'BINARY_OUTPUT', False)
+    monkeypatch.setattr(sequential_run, 'log_message', lambda *args, **kwargs: None)
+    return tmp_path
+
+
+def chunk_path(work_dir, chunk):
+    return work_dir / (sequential_run.DAT_PATTERN % (FINAL_STEP + chunk))
+
+
+def write_chunks(work_dir, chunks):
+    for chunk, rows in enumerate(chunks):
+        lines = [f"{NX} {NY} {NZ}\n"]
+        lines += [f"{i} {j} {k} {px:.8e} {py:.8e} {pz:.8e}\n" for i, j, k, px, py, pz in rows]
+        chunk_path(work_dir, chunk).write_text(''.join(lines))
+
+
+def reference_pxyz(work_dir):
+    """Rebuild pxyz.in the way the original per-line loop did."""
+    values = {}
+    for chunk in range(NUM_CHUNKS):
+        with open(chunk_path(work_dir, chunk)) as f:
+            f.readline()
+            for line in f:
+                pts = line.split()
+                if len(pts) < 6:
+                    continue
+                values[tuple(map(int, pts[:3]))] = np.array(pts[3:6], dtype=np.float32)
+    lines = [f"{NX} {NY} {NZ}\n"]
+    for i in range(1, NX + 1):
+        for j in range(1, NY + 1):
+            for k in range(1, NZ + 1):
+                p = values.get((i, j, k), np.zeros(3, dtype=np.float32))
+                lines.append(f"{i} {j} {k} {p[0]:.5e} {p[1]:.5e} {p[2]:.5e}\n")
+    return ''.join(lines)
+
+
+def grid_rows(seed=0):
+    rng = np.random.default_rng(seed)
+    return [(i, j, k, *rng.standard_normal(3))
+            for i in range(1, NX + 1) for j in range(1, NY + 1) for k in range(1, NZ + 1)]
+
+
+def split(rows):
+    return [list(part) for part in np.array_split(np.array(rows, dtype=object), NUM_CHUNKS)]
+
+
+def check(work_dir):
+    assert sequential_run.extract_final_state(FINAL_STEP)
+    assert (work_dir / 'pxyz.in').read_text() == reference_pxyz(work_dir)
+
+
+def test_in_order_chunks(work_dir):
+    write_chunks(work_dir, split(grid_rows()))
+    check(work_dir)
+
+
+def test_shuffled_chunks(work_dir):
+    rows = grid_rows()
+    order = np.random.default_rng(1).permutation(len(rows))
+    write_chunks(work_dir, split([rows[r] for r in order]))
+    check(work_dir)
+
+
+def test_sparse_chunks(work_dir):
+    rows = grid_rows()
+    write_chunks(work_dir, split(rows[::3]))
+    check(work_dir)
+
+
+def test_overlapping_chunks(work_dir):
+    # Later chunks repeat points with new values: more rows than grid points
+    rows = grid_rows()
+    chunks = split(rows)
+    chunks[2] = chunks[2] + grid_rows(seed=2)[:20]
+    chunks[3] = chunks[3] + grid_rows(seed=3)[10:40]
+    write_chunks(work_dir, chunks)
+    check(work_dir)
+
+
+def test_complete_grid_with_duplicates(work_dir):
+    # Right row count, but one point is repeated and another is missing
+    rows = grid_rows()
+    rows[7] = (*rows[8][:3], 1.0, 2.0, 3.0)
+    write_chunks(work_dir, split(rows))
+    check(work_dir)
+
+
+def test_empty_chunks(work_dir):
+    write_chunks(work_dir, [[] for _ in range(NUM_CHUNKS)])
+    check(work_dir)
+
+
+@pytest.mark.parametrize('bad_row', [
+    (NX + 1, 1, 1, 0.1, 0.2, 0.3),
+    (1, 0, 1, 0.1, 0.2, 0.3),
+    (1, 1, NZ + 1, 0.1, 0.2, 0.3),
+])
+def test_out_of_range_index_fails(work_dir, bad_row):
+    chunks = split(grid_rows())
+    chunks[1].append(bad_row)
+    write_chunks(work_dir, chunks)
+    assert not sequential_run.extract_final_state(FINAL_STEP)
+    assert not (work_dir / 'pxyz.in').exists()
+
+
+def test_empty_chunk_file_fails(work_dir):
+    write_chunks(work_dir, split(grid_rows()))
+    chunk_path(work_dir, 2).write_text('')
+    assert not sequential_run.extract_final_state(FINAL_STEP)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Checks that both PELOOP chunk readers (pandas and NumPy) follow the
+original per-line parser: rows with fewer than six fields are skipped and
+genuine nan values are kept.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sequential_run
+
+
+def reference_rows(lines):
+    rows = []
+    for line in lines:
+        pts = line.split()
+        if len(pts) < 6:
+            continue
+        rows.append([*map(int, pts[:3]), *map(float, pts[3:6])])
+    return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+
+@pytest.fixture(params=['pandas', 'numpy'])
+def reader(request, monkeypatch):
+    if request.param == 'pandas':
+        pytest.importorskip('pandas')
+    else:
+        monkeypatch.setattr(sequential_run, 'pd', None)
+    return request.param
+
+
+def write_chunk(tmp_path, lines):
+    path = tmp_path / 'PELOOP.00000000.dat'
+    path.write_text('2 2 2\n' + ''.join(line + '\n' for line in lines))
+    return str(path)
+
+
+GOOD_ROWS = [
+    '1 1 1 1.0e-01 2.0e-01 3.0e-01',
+    '1 1 2 -4.0e-01 5.0e-01 -6.0e-01',
+    '2 2 2 7.0e-01 8.0e-01 9.0e-01 extra',
+]
+
+
+@pytest.mark.parametrize('last_line', [
+    '2 1 1 0.4 0.5',
+    '1 2 3 1.2e-',
+    '1 2 3 0.1 -',
+    'END',
+    '3 4',
+    '',
+])
+def test_short_last_row_is_skipped(tmp_path, reader, last_line):
+    lines = GOOD_ROWS + [last_line]
+    header, data = sequential_run.parse_chunk(write_chunk(tmp_path, lines))
+    assert header == ['2', '2', '2']
+    np.testing.assert_array_equal(data, reference_rows(lines))
+    assert len(data) == len(GOOD_ROWS)
+
+
+def test_short_first_row_is_skipped(tmp_path, reader):
+    lines = ['1 1 1 0.1 0.2', '   '] + GOOD_ROWS
+    _, data = sequential_run.parse_chunk(write_chunk(tmp_path, lines))
+    np.testing.assert_array_equal(data, reference_rows(lines))
+
+
+def test_nan_values_are_kept(tmp_path, reader):
+    lines = GOOD_ROWS + ['2 1 1 nan 1.0e-01 2.0e-01', '2 1 2 0.1 0.2']
+    _, data = sequential_run.parse_chunk(write_chunk(tmp_path, lines))
+    np.testing.assert_array_equal(data, reference_rows(lines))
+    assert np.isnan(data[-1, 3])
+
+
+def test_malformed_six_field_row_raises(tmp_path, reader):
+    lines = GOOD_ROWS + ['2 1 1 0.1 0.2 1.2e-']
+    with pytest.raises(ValueError):
+        sequential_run.parse_chunk(write_chunk(tmp_path, lines))
+
+
+def test_header_only_chunk_is_empty(tmp_path, reader):
+    _, data = sequential_run.parse_chunk(write_chunk(tmp_path, []))
+    assert data.shape == (0, 6)
+
+
+@pytest.mark.parametrize('read_header', [True, False])
+@pytest.mark.parametrize('content', ['', '\n', '2 2\n1 1 1 0.1 0.2 0.3\n'])
+def test_missing_or_short_header_is_rejected(tmp_path, reader, read_header, content):
+    path = tmp_path / 'PELOOP.00000001.dat'
+    path.write_text(content)
+    _, data = sequential_run.parse_chunk(str(path), read_header)
+    assert data is None
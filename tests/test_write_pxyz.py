@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regression checks for the pxyz.in writer against np.savetxt.
+"""
+
+import io
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sequential_run
+
+
+def savetxt_reference(nx, ny, nz, out):
+    buf = io.StringIO()
+    buf.write(f"{nx} {ny} {nz}\n")
+    np.savetxt(buf, out, fmt='%d %d %d %.5e %.5e %.5e')
+    return buf.getvalue()
+
+
+def make_table(values, dtype):
+    p = np.resize(np.asarray(values, dtype=dtype), (len(values) + 2) // 3 * 3).reshape(-1, 3)
+    out = np.empty((len(p), 6), dtype=dtype)
+    out[:, :3] = np.arange(1, len(p) + 1)[:, None]
+    out[:, 3:] = p
+    return out
+
+
+EDGE_VALUES = [0.0, -0.0, 1.0, -1.0, 10.0, 0.5, 9.999995, 9.9999949, 1234565.0,
+               1234575.0, 100000.5, 999999.5, 123456.5, 1e-5, 1e-45, -1e-45,
+               3.4e38, np.nan, np.inf, -np.inf]
+
+
+def test_float32_rows_match_savetxt(tmp_path, monkeypatch):
+    pytest.importorskip('numba')
+    # Small blocks so the block boundaries are exercised too
+    monkeypatch.setattr(sequential_run, 'PXYZ_BLOCK_ROWS', 1000)
+
+    rng = np.random.default_rng(0)
+    values = rng.standard_normal(300000) * 10.0 ** rng.integers(-40, 38, 300000)
+    for vals in (EDGE_VALUES, values):
+        out = make_table(vals, np.float32)
+        path = str(tmp_path / 'pxyz.in')
+        sequential_run.write_pxyz(path, 1, 1, len(out), out)
+        with open(path) as f:
+            assert f.read() == savetxt_reference(1, 1, len(out), out)
+
+
+def test_float64_rows_match_savetxt(tmp_path):
+    # Seven-digit float64 near-ties that float64 scaling would misround
+    rng = np.random.default_rng(1)
+    values = rng.integers(1000000, 10000000, 30000) * 10.0 ** rng.integers(-12, 6, 30000)
+    out = make_table(np.concatenate([[1.000005, 2.500005e-3], values]), np.float64)
+    path = str(tmp_path / 'pxyz.in')
+    sequential_run.write_pxyz(path, 1, 1, len(out), out)
+    with open(path) as f:
+        assert f.read() == savetxt_reference(1, 1, len(out), out)